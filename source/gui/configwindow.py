@@ -63,6 +63,7 @@ config_window.finished.connect(self.updateConfiguration) #Optionnal signal to kn
 from __future__ import absolute_import
 
 import sys
+import re
 
 import inspect
 
@@ -81,16 +82,131 @@ import globals.constants as c
 if c.PYQT5notPYQT4:
     from PyQt5.QtWidgets import QTabWidget, QDialog, QDialogButtonBox, QMessageBox, QVBoxLayout, QHBoxLayout, QLayout, QFrame, QGridLayout, QLabel, QLineEdit, QTextEdit, QCheckBox, QSpinBox, QDoubleSpinBox, QComboBox, QTableWidget, QTableWidgetItem, QPushButton, QAbstractItemView, QWidget, QSizePolicy
     from PyQt5.QtGui import QIcon, QPixmap, QValidator, QRegExpValidator
-    from PyQt5.QtCore import QLocale, QRegExp
+    from PyQt5.QtCore import QLocale, QRegExp, QTimer
     from PyQt5 import QtCore, QtGui
 else:
     from PyQt4.QtGui import QTabWidget, QDialog, QDialogButtonBox, QMessageBox, QVBoxLayout, QHBoxLayout, QLayout, QFrame, QGridLayout, QLabel, QLineEdit, QTextEdit, QCheckBox, QSpinBox, QDoubleSpinBox, QComboBox, QTableWidget, QTableWidgetItem, QPushButton, QAbstractItemView, QWidget, QSizePolicy, QIcon, QPixmap, QValidator, QRegExpValidator
-    from PyQt4.QtCore import QLocale, QRegExp
+    from PyQt4.QtCore import QLocale, QRegExp, QTimer
     from PyQt4 import QtCore
 
 
 logger = logging.getLogger("Gui.ConfigWindow")
 
+#Conversion of the texts read from the widgets: PyQt5 already returns python strings, PyQt4 may return QStrings
+_toStr = (lambda text: text) if c.PYQT5notPYQT4 else str
+
+#Regular expression used by the configspec parser to exctract a limit from one of the arguments, eg "max = 360" in "float(min = 0, max = 360, default = 20)". The value is checked when it is converted
+_KV_RE = re.compile(r"^(min|max)\s*=\s*(.+)$")
+
+#Results of _parseSpec(), indexed by (configspec, comments)
+_parsed_specs = {}
+
+
+def _parseSpec(configspec, comments):
+    """
+    Parse a configspec string (eg "float(min = 0, max = 360, default = 20)") and the comments that belong to it.
+    The results are cached, since the configuration window parses the same few specs again and again.
+    @param configspec: configspec string of an entry
+    @param comments: tuple of strings containing the comments for the entry
+    @return: the dictionary described in ConfigWindow.configspecParser(). It must not be modified, it is shared.
+    """
+    key = (configspec, comments)
+    if key in _parsed_specs:
+        return _parsed_specs[key]
+    
+    #The type of the entry is the name before the parenthesis (eg "float"), its arguments are inside the parenthesis
+    kind, _, body = configspec.partition('(')
+    parser = _SPEC_PARSERS.get(kind.strip())
+    if parser is not None:
+        minimum, maximum, string_list = parser(body.rsplit(')', 1)[0])
+    else:
+        #No limits nor options for the other types (eg "boolean" or "list")
+        minimum, maximum, string_list = (None, None, [])
+    
+    comments_string = _parseComments(comments)
+    
+    logger.debug('configspecParser(): exctracted option elements = %r, min = %r, max = %r, comment = %r', string_list, minimum, maximum, comments_string)
+    
+    result = {}
+    result['minimum'] = minimum
+    result['maximum'] = maximum
+    result['string_list'] = string_list
+    result['comment'] = comments_string
+    _parsed_specs[key] = result
+    return result
+
+
+def _parseOption(body):
+    """
+    Handle "option" config entries, eg "'mm', 'in', default = 'mm'": keep only the quoted items (drop the "default=" parameter) and remove the quotes
+    @param body: the arguments of the configspec entry
+    @return (minimum, maximum, string_list)
+    """
+    elements = [element.strip() for element in body.split(',')]
+    return (None, None, [element.strip('"\'') for element in elements if element[:1] in ('"', "'")])
+
+
+def _parseLimits(convert, body):
+    """
+    Handle "integer", "string" (min / max length) and "float" config entries, eg "min = 0, max = 360, default = 20"
+    @param convert: function used to convert the limits (int or float)
+    @param body: the arguments of the configspec entry
+    @return (minimum, maximum, string_list)
+    """
+    minimum = None
+    maximum = None
+    
+    #Limits can be given as positional parameters, eg "integer(0, 100)" ...
+    elements = [element.strip() for element in body.split(',')]
+    positional = [element for element in elements if element and '=' not in element]
+    if len(positional) > 0:
+        minimum = _convertLimit(convert, positional[0])
+    if len(positional) > 1:
+        maximum = _convertLimit(convert, positional[1])
+    #... or as keywords, eg "integer(min = 0, max = 100)"
+    for element in elements:
+        match = _KV_RE.match(element)
+        if match is None:
+            continue
+        name, value = match.groups()
+        if name == 'min' and minimum is None:
+            minimum = _convertLimit(convert, value)
+        elif name == 'max' and maximum is None:
+            maximum = _convertLimit(convert, value)
+    
+    return (minimum, maximum, [])
+
+
+#Parser of the arguments for each type of configspec entry
+_SPEC_PARSERS = {
+    'option': _parseOption,
+    'integer': lambda body: _parseLimits(int, body),
+    'string': lambda body: _parseLimits(int, body),
+    'float': lambda body: _parseLimits(float, body),
+}
+
+
+def _parseComments(comments):
+    """
+    Handle comments: comments are stored in a list and contains any chars that are in the configfile (including the hash symbol and the spaces)
+    @return: the comment text, possibly an empty string
+    """
+    if not comments:
+        return ''
+    
+    return ''.join(comment.strip() for comment in comments).strip(' #').replace('#', '\n')
+
+
+def _convertLimit(convert, string):
+    """
+    Convert a limit exctracted from a configspec (eg the "360" of "max = 360") with the given function (int or float)
+    @return: the converted value, or None if the string can't be converted
+    """
+    try:
+        return convert(string)
+    except ValueError:
+        return None
+
 
 class ConfigWindow(QDialog):
     Applied = QDialog.Accepted + QDialog.Rejected + 1 #Define a result code that is different from accepted and rejected
@@ -110,8 +226,15 @@ class ConfigWindow(QDialog):
         self.var_dict = config #This is the data from the configfile (dictionary created by ConfigObj class)
         self.configspec = configspec #This is the specifications for all the entries defined in the config file
         
-        #Create the config window according to the description dict received
-        config_widget = self.createWidgetFromDefinitionDict()
+        #List the items of the config window, along with their configuration
+        self.sorted_sections = {} #Sorted sections names of each dict of the definition, indexed by the id() of the dict
+        self.pending_leaves = self.listLeaves(self.cfg_window_def, self.var_dict, self.configspec)
+        self.leaves = [] #Items of the tabs that are already built, the other ones are still in self.pending_leaves
+        
+        #Create the config window according to the description dict received. The content of the tabs is only built when they are displayed for the first time
+        self.pending_tabs = {} #Tabs which are not built yet, indexed by the tab number
+        self.tab_widget = self.createWidgetFromDefinitionDict()
+        self.tab_widget.currentChanged.connect(self.realizeTab)
         
         #Create 3 buttons
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel | QDialogButtonBox.Apply)
@@ -122,12 +245,12 @@ class ConfigWindow(QDialog):
         
         #Layout the 2 above widgets vertically
         v_box = QVBoxLayout(self)
-        v_box.addWidget(config_widget)
+        v_box.addWidget(self.tab_widget)
         v_box.addWidget(button_box)
         self.setLayout(v_box)
         
-        #Populate our Configuration widget with the values from the config file
-        self.setValuesFromConfig(self.cfg_window_def, self.var_dict, self.configspec)
+        #Build the first tab and populate it with the values from the config file
+        self.realizeTab(self.tab_widget.currentIndex())
 
     def tr(self, string_to_translate):
         """
@@ -141,9 +264,9 @@ class ConfigWindow(QDialog):
         """
         Check and apply the changes, then close the config window (OK button)
         """
-        ok, errors_list = self.validateConfiguration(self.cfg_window_def)
+        ok, errors_list = self.validateConfiguration()
         if ok:
-            self.updateConfiguration(self.cfg_window_def, self.var_dict) #Update the configuration dict according to the new settings in our config window
+            self.updateConfiguration() #Update the configuration dict according to the new settings in our config window
             QDialog.accept(self)
             logger.info('New configuration OK')
         else:
@@ -153,9 +276,9 @@ class ConfigWindow(QDialog):
         """
         Apply changes without closing the window (allow to test some changes without reopening the config window each time)
         """
-        ok, errors_list = self.validateConfiguration(self.cfg_window_def)
+        ok, errors_list = self.validateConfiguration()
         if ok:
-            self.updateConfiguration(self.cfg_window_def, self.var_dict) #Update the configuration dict according to the new settings in our config window
+            self.updateConfiguration() #Update the configuration dict according to the new settings in our config window
             self.setResult(ConfigWindow.Applied) #Return a result code that is different from accepted and rejected
             self.finished.emit(self.result())
             logger.info('New configuration applied')
@@ -166,7 +289,10 @@ class ConfigWindow(QDialog):
         """
         Reload our configuration widget with the values from the config file (=> Cancel the changes in the config window), then close the config window
         """
-        self.setValuesFromConfig(self.cfg_window_def, self.var_dict, self.configspec)
+        modified_leaves = self.modifiedLeaves()
+        if modified_leaves:
+            #Only reload the widgets changed by the user, repopulating the tables means recreating all their cells
+            self.setValuesFromConfig(modified_leaves)
         QDialog.reject(self)
         logger.info('New configuration cancelled')
 
@@ -184,57 +310,46 @@ class ConfigWindow(QDialog):
     def createWidgetFromDefinitionDict(self):
         """
         Automatically build a widget, based on dict definition of the items.
-        @return: a QWidget containing all the elements of the configuration window
+        The tabs are created empty, their content is built by realizeTab()
+        @return: a QTabWidget containing all the tabs of the configuration window
         """
         logger.info('Creating configuration window')
         tab_widget = QTabWidget()
+        #Don't update / emit signals for each item inserted, the whole window is layed out once at the end (the tabs are children of tab_widget, so they are disabled too)
+        tab_widget.setUpdatesEnabled(False)
+        tab_widget.blockSignals(True)
         definition = self.cfg_window_def
         
-        #Create a dict with the sections' titles if not already defined. This dict contains sections' names as key and tabs' titles as values
-        if '__section_title__' not in definition:
-            definition['__section_title__'] = {}
-
+        #Create a dict with the sections' titles. This dict contains sections' names as key and tabs' titles as values (copied, so that the definition dict isn't modified)
+        titles = dict(definition.get('__section_title__', {}))
+        
+        tabs = {} #Tabs already created (widget, list of the sections definitions), indexed by their title
+        
         #Compute all the sections
-        for section in sorted(definition):
-            #skip the special section __section_title__
-            if section == '__section_title__':
-                continue
-            
+        for section in self.sorted_sections[id(definition)]:
             #Create the title for the section if it doesn't already exist
-            if section not in definition['__section_title__']:
+            if section not in titles:
                 #The title for this section doesn't exist yet
                 if isinstance(definition[section], dict) and '__section_title__' in definition[section]:
                     #The title for this section is defined into the section itself => we add the title to the dict containing all the titles
-                    definition['__section_title__'][section] = definition[section]['__section_title__']
+                    titles[section] = definition[section]['__section_title__']
                 else:
                     #The title for this section is not defined anywhere, so we use the section name itself as a title
-                    definition['__section_title__'][section] = section.replace('_', ' ')
+                    titles[section] = section.replace('_', ' ')
         
             #Create the tab (and the widget) for the current section, if it doesn't exist yet
-            widget = None
-            for i in range(tab_widget.count()):
-                if definition['__section_title__'][section] == tab_widget.tabText(i):
-                    widget = tab_widget.widget(i)
-                    break
-            
-            if widget is None:
-                widget = QWidget()
-                tab_widget.addTab(widget, definition['__section_title__'][section])
+            title = titles[section]
+            tab = tabs.get(title)
+            if tab is None:
+                tab = (QWidget(), [])
+                tabs[title] = tab
+                self.pending_tabs[tab_widget.addTab(tab[0], title)] = tab
             
-            #Create the tab content for this section
-            self.createWidgetSubSection(definition[section], widget)
-            #Add a separator at the end of this subsection
-            if widget.layout() is not None:
-                separator = QFrame()
-                separator.setFrameShape(QFrame.HLine)
-                widget.layout().addWidget(separator)
-                widget.layout().addStretch()
-
-        #Add a QSpacer at the bottom of each widget, so that the items are placed on top of each tab
-        for i in range(tab_widget.count()):
-            if tab_widget.widget(i).layout() is not None:
-                tab_widget.widget(i).layout().addStretch()
+            #The tab content for this section is created later, see realizeTab()
+            tab[1].append(definition[section])
         
+        tab_widget.blockSignals(False)
+        tab_widget.setUpdatesEnabled(True)
         return tab_widget
 
     def createWidgetSubSection(self, subdefinition, section_widget):
@@ -242,7 +357,7 @@ class ConfigWindow(QDialog):
         Create the widgets that will be inserted into the tabs of the configuration window
         @param subdefinition: part of the definition dict
         @param section_widget: the widget that host the subwidgets
-        @return: section_widget (for recursive call)
+        @return: the list of the items inserted into section_widget
         """
         #section_widget = QWidget()
         vertical_box = section_widget.layout()
@@ -251,57 +366,119 @@ class ConfigWindow(QDialog):
             section_widget.setLayout(vertical_box)
         vertical_box.setSpacing(0) #Don't use too much space, it makes the option window too big otherwise
         
+        items_list = []
         if isinstance(subdefinition, dict):
-            for subsection in sorted(subdefinition):
-                if subsection == '__section_title__':
-                    #skip the special section
-                    continue
-                
+            for subsection in self.sorted_sections[id(subdefinition)]:
                 #Browse sublevels
-                self.createWidgetSubSection(subdefinition[subsection], section_widget) #Recursive call, all the nested configuration item will appear at the same level
+                items_list.extend(self.createWidgetSubSection(subdefinition[subsection], section_widget)) #Recursive call, all the nested configuration item will appear at the same level
         else:
             if isinstance(subdefinition, (QWidget, QLayout)):
                 vertical_box.addWidget(subdefinition)
+                items_list.append(subdefinition)
             else:
                 #Item should be a layout or a widget
                 logger.error("item subdefinition is incorrect")
         
-        return section_widget
+        return items_list
 
+    def realizeTab(self, index):
+        """
+        Create the content of a tab, the first time it is displayed, and populate it with the values from the config file
+        @param index: the tab number
+        """
+        if index not in self.pending_tabs:
+            #Tab already built
+            return
+        
+        widget, subdefinitions = self.pending_tabs.pop(index)
+        widget.setUpdatesEnabled(False) #Layout the tab once, when all the items are inserted
+        items_ids = set()
+        for subdefinition in subdefinitions:
+            #Create the tab content for this section
+            items_ids.update(id(item) for item in self.createWidgetSubSection(subdefinition, widget))
+            #Add a separator at the end of this subsection
+            if widget.layout() is not None:
+                separator = QFrame()
+                separator.setFrameShape(QFrame.HLine)
+                widget.layout().addWidget(separator)
+                widget.layout().addStretch()
+        
+        #Add a QSpacer at the bottom of the widget, so that the items are placed on top of the tab
+        if widget.layout() is not None:
+            widget.layout().addStretch()
+        widget.setUpdatesEnabled(True)
+        
+        #From now on, the items of this tab are handled like the other ones
+        leaves = [leaf for leaf in self.pending_leaves if id(leaf[0]) in items_ids]
+        self.pending_leaves = [leaf for leaf in self.pending_leaves if id(leaf[0]) not in items_ids]
+        self.leaves.extend(leaves)
+        self.setValuesFromConfig(leaves)
 
-    def setValuesFromConfig(self, window_def, config, configspec):
+
+    def listLeaves(self, window_def, config, configspec):
         """
-        This function populates the option widget with the values that come from the configuration file.
-        The values from the configuration file are stored into a dictionary, we browse this dictionary to populate our window
+        Browse the dict that describes our window and list the items (widgets) that it contains, with the configuration that belongs to each of them.
+        This is done only once, so that populating, validating and updating the configuration don't need to walk the nested dicts again.
+        The sorted sections names of each dict are stored into self.sorted_sections.
         @param window_def: the dict that describes our window
         @param config: data readed from the configfile. This dict is created by ConfigObj module.
         @param configspec: specifications of the configfile. This variable is created by ConfigObj module.
+        @return: a list of tuples (widget, config, key, spec, comments), where config[key] is the value of the widget (config is None if the item is not found in the config file) and spec / comments come from the configspec (None if not found)
         """
+        leaves = []
+        #Sort the sections once for all (skip the special section __section_title__), the window items are displayed in this order
+        sections = sorted(section for section in window_def if section != '__section_title__')
+        self.sorted_sections[id(window_def)] = sections
+        
+        #The items store the key objects of the config dict itself: the lookups of their values then match the keys by identity (as with interned strings) instead of comparing the strings
+        config_keys = {}
+        if config is not None:
+            config_keys = dict((key, key) for key in config)
+        
         #Compute all the sections
-        for section in window_def:
-            #skip the special section __section_title__
-            if section == '__section_title__':
-                continue
-            
-            if config is not None and section in config:
-                if isinstance(window_def[section], dict):
-                    #Browse sublevels
-                    configspec_sub = None
-                    if configspec is not None and section in configspec:
-                        configspec_sub = configspec[section]
-                    self.setValuesFromConfig(window_def[section], config[section], configspec_sub) #Recursive call, until we find a real item (not a dictionnary with subtree)
+        for section in sections:
+            parent_config = None #dict that holds the value (or the sublevels) of the current section
+            if config is not None:
+                if section in config_keys:
+                    parent_config = config
                 else:
-                    if isinstance(window_def[section], (QWidget, QLayout)):
-                        #assign the configuration retrieved from the configspec object of the ConfigObj
-                        if configspec is not None and section in configspec:
-                            window_def[section].setSpec(self.configspecParser(configspec[section], configspec.comments[section]))
-                        #assign the value that was readed from the configfile
-                        window_def[section].setValue(config[section])
-                    else:
-                        #Item should be a layout or a widget
-                        logger.warning("item {0} is not a widget, can't set it's value!".format(window_def[section]))
+                    logger.error("item or section %s not found in config file!", section)
+            
+            if isinstance(window_def[section], dict):
+                #Browse sublevels
+                configspec_sub = None
+                if configspec is not None and section in configspec:
+                    configspec_sub = configspec[section]
+                leaves.extend(self.listLeaves(window_def[section], parent_config[section] if parent_config is not None else None, configspec_sub)) #Recursive call, until we find a real item (not a dictionnary with subtree)
+            elif isinstance(window_def[section], (QWidget, QLayout)):
+                spec = None
+                comments = None
+                if configspec is not None and section in configspec:
+                    spec = configspec[section]
+                    comments = tuple(configspec.comments[section])
+                leaves.append((window_def[section], parent_config, config_keys.get(section, section), spec, comments))
             else:
-                logger.error("can't assign values, item or section {0} not found in config file!".format(section))
+                #Item should be a layout or a widget
+                logger.warning("item %s is not a widget, it won't be handled!", window_def[section])
+        
+        return leaves
+
+    def setValuesFromConfig(self, leaves = None):
+        """
+        This function populates the option widget with the values that come from the configuration file.
+        The values from the configuration file are stored into a dictionary (self.var_dict)
+        @param leaves: the items to populate (see listLeaves()), all the items of the tabs already built if None
+        """
+        if leaves is None:
+            leaves = self.leaves
+        for widget, config, key, spec, comments in leaves:
+            if config is None:
+                continue
+            #assign the configuration retrieved from the configspec object of the ConfigObj
+            if spec is not None:
+                widget.setSpec(self.configspecParser(spec, comments))
+            #assign the value that was readed from the configfile
+            widget.setValue(config[key])
 
 
     def configspecParser(self, configspec, comments):
@@ -317,218 +494,53 @@ class ConfigWindow(QDialog):
         - string_list : contains the list of options for an "option" field, or the column titles for a table
         - comment : a text with the comment that belongs to the parameter (possibly an empty string if nothing found)
         """
-        #logger.debug('configspecParser({0}, {1})'.format(configspec, comments))
-        minimum = None
-        maximum = None
-        string_list = []
-        
         if isinstance(configspec, dict):
             #If the received configspec is a dictionary, we most likely have a table, so we are going to exctract sections names of this table
+            string_list = []
             
-                #When tables are used, the "__many__" config entry is used for the definition of the configspec, so we try to excract the sections names by using this __many__ special keyword.
-                #Example: 'Tool_Parameters': {[...], '__many__': {'diameter': 'float(default = 3.0)', 'speed': 'float(default = 6000)', 'start_radius': 'float(default = 3.0)'}}
-                if '__many__' in configspec and isinstance(configspec['__many__'], dict):
-                    string_list = configspec['__many__'].keys()
-                    string_list.insert(0, '') #prepend an empty element since the first column of the table is the row name (eg a unique tool number)
-        
-        else:
-            #configspec is normaly a string from which we can exctrat min / max values and possibly a list of options
+            #When tables are used, the "__many__" config entry is used for the definition of the configspec, so we try to excract the sections names by using this __many__ special keyword.
+            #Example: 'Tool_Parameters': {[...], '__many__': {'diameter': 'float(default = 3.0)', 'speed': 'float(default = 6000)', 'start_radius': 'float(default = 3.0)'}}
+            if '__many__' in configspec and isinstance(configspec['__many__'], dict):
+                string_list = [''] + list(configspec['__many__'].keys()) #prepend an empty element since the first column of the table is the row name (eg a unique tool number)
             
-            #Handle "option" config entries
-            string_list = self.configspecParserExctractSections('option', configspec)
-            i = 0
-            while i < len(string_list): #DON'T replace this with a "for", it would silently skip some steps because we remove items inside the loop
-                #if not string_list[i]:
-                #	del string_list[i]
-                #	continue
-                
-                #remove leading and trailing spaces
-                string_list[i] = string_list[i].strip()
-                
-                #remove unwanted items which are unquoted (like the "default=" parameter) and remove the quotes
-                if string_list[i].startswith('"'):
-                    string_list[i] = string_list[i].strip('"')
-                elif string_list[i].startswith("'"):
-                    string_list[i] = string_list[i].strip("'")
-                else:
-                    #unwanted item, it doesn't contain an element of the option()
-                    del string_list[i]
-                    continue
-                    
-                i += 1
-            
-            #Handle "integer" and "string" config entries
-            if len(string_list) <= 0:
-                string_list = self.configspecParserExctractSections('integer', configspec)
-                if len(string_list) <= 0:
-                    string_list = self.configspecParserExctractSections('string', configspec)
-                i = 0
-                while i < len(string_list): #DON'T replace this with a "for", it would silently skip some steps because we remove items inside the loop
-                    element = string_list[i]
-                    #remove empty elements
-                    if not element:
-                        del string_list[i]
-                        continue
-                    
-                    #remove leading and trailing spaces
-                    element = element.strip()
-                    
-                    if minimum is None:
-                        try: minimum = int(element)
-                        except ValueError: pass
-                    else:
-                        if maximum is None:
-                            try: maximum = int(element)
-                            except ValueError: pass
-                    
-                    if minimum is None and 'min' in element:
-                        #'min' string found in a string like "min = -7"
-                        element = element.replace('min', '')
-                        element = element.strip(' =')
-                        try: minimum = int(element)
-                        except ValueError: pass
-                    
-                    if maximum is None and 'max' in element:
-                        #'max' string found
-                        element = element.replace('max', '')
-                        element = element.strip(' =')
-                        try: maximum = int(element)
-                        except ValueError: pass
-                    
-                    i += 1
-            
-            #Handle "float" config entries
-            if len(string_list) <= 0:
-                string_list = self.configspecParserExctractSections('float', configspec)
-                i = 0
-                while i < len(string_list): #DON'T replace this with a "for", it would silently skip some steps because we remove items inside the loop
-                    element = string_list[i]
-                    #remove empty elements
-                    if not element:
-                        del string_list[i]
-                        continue
-                    
-                    #remove leading and trailing spaces
-                    element = element.strip()
-                    
-                    if minimum is None:
-                        try: minimum = float(element)
-                        except ValueError: pass
-                    else:
-                        if maximum is None:
-                            try: maximum = float(element)
-                            except ValueError: pass
-                    
-                    if minimum is None and 'min' in element:
-                        #'min' string found in a string like "min = -7"
-                        element = element.replace('min', '')
-                        element = element.strip(' =')
-                        try: minimum = float(element)
-                        except ValueError: pass
-                    
-                    if maximum is None and 'max' in element:
-                        #'max' string found
-                        element = element.replace('max', '')
-                        element = element.strip(' =')
-                        try: maximum = float(element)
-                        except ValueError: pass
-                    
-                    i += 1
-        
-        #Handle comments: comments are stored in a list and contains any chars that are in the configfile (including the hash symbol and the spaces)
-        comments_string = ''
-        if len(comments) > 0:
-            for comment in comments:
-                comments_string += comment.strip()
-            
-            comments_string = comments_string.strip(' #')
-            comments_string = comments_string.replace('#', '\n')
-        
-        logger.debug('configspecParser(): exctracted option elements = {0}, min = {1}, max = {2}, comment = {3}'.format(string_list, minimum, maximum, comments_string))
+            return {'minimum': None, 'maximum': None, 'string_list': string_list, 'comment': _parseComments(comments)}
         
-        result = {}
-        result['minimum'] = minimum
-        result['maximum'] = maximum
-        result['string_list'] = string_list
-        result['comment'] = comments_string
-        return result
+        #configspec is normaly a string, the result of the parsing is cached since the same specs are used for many entries
+        result = _parseSpec(configspec, tuple(comments))
+        return dict(result, string_list = list(result['string_list'])) #Return a copy, the caller may modify the string list
 
-    def configspecParserExctractSections(self, attribute_name, string):
+
+    def modifiedLeaves(self):
         """
-        returns a list of item from a string. Eg the string "option('mm', 'in', default = 'mm')" will be exploded into the string list ["mm", "in", "default = 'mm'"]
+        List the widgets modified by the user since their values were read from the config file (or written to it). The values can't be compared, since getValue() ignores some changes (eg a table line without a name)
+        @return: the list of the modified leaves (see listLeaves())
         """
-        string_list = []
-        
-        pos_init = string.find(attribute_name + '(')
-        if pos_init >= 0:
-            pos_init += len(attribute_name + '(') #skip the "option("
-            
-            pos_end = string.find(')', pos_init)
-            if pos_end > pos_init:
-                #print("substring found = {0}".format(string[pos_init:pos_end]))
-                string_list = string[pos_init:pos_end].split(',')
-        
-        return string_list
+        return [leaf for leaf in self.leaves if leaf[0].dirty]
 
 
-    def validateConfiguration(self, window_def, result_string = '', result_bool = True):
+    def validateConfiguration(self):
         """
         Check the configuration (check the limits, eg min/max values, ...). These limits are set according to the configspec passed to the constructor
-        @param window_def: the dict that describes our window
-        @param result_string: use only for recursive call
-        @param result_bool: use only for recursive call
         @return (result_bool, result_string):
          - result_bool: True if no errors were encountered, False otherwise
          - result_string: a string containing all the errors encountered during the validation
         """
-        #Compute all the sections
-        for section in window_def:
-            #skip the special section __section_title__
-            if section == '__section_title__':
-                continue
-            
-            if isinstance(window_def[section], dict):
-                #Browse sublevels
-                (result_bool, result_string) = self.validateConfiguration(window_def[section], result_string, result_bool) #Recursive call, until we find a real item (not a dictionnary with subtree)
-            else:
-                if isinstance(window_def[section], (QWidget, QLayout)):
-                    #check that the value is correct for each widget
-                    result = window_def[section].validateValue()
-                    if result[0] is False: result_bool = False
-                    result_string += result[1]
-                else:
-                    #Item should be a layout or a widget
-                    logger.warning("item {0} is not a widget, can't validate it!".format(window_def[section]))
-        
+        #check that the value is correct for each widget
+        results = [leaf[0].validateValue() for leaf in self.leaves]
+        result_bool = all(result[0] is not False for result in results)
+        result_string = ''.join(result[1] for result in results)
         return (result_bool, result_string)
 
 
-    def updateConfiguration(self, window_def, config):
+    def updateConfiguration(self):
         """
         Update the application configuration (ConfigObj) according to the changes made into the ConfigWindow.
         The self.var_dict variable is updated
-        @param window_def: the dict that describes our window
-        @param config: data readed from the configfile. This dict is created by ConfigObj module and will be updated here.
         """
-        #Compute all the sections
-        for section in window_def:
-            #skip the special section __section_title__
-            if section == '__section_title__':
-                continue
-            
-            if config is not None and section in config:
-                if isinstance(window_def[section], dict):
-                    #Browse sublevels
-                    self.updateConfiguration(window_def[section], config[section]) #Recursive call, until we find a real item (not a dictionnary with subtree)
-                else:
-                    if isinstance(window_def[section], (QWidget, QLayout)):
-                        #assign the value that was readed from the configfile
-                        config[section] = window_def[section].getValue()
-                    else:
-                        #Item should be a layout or a widget
-                        logger.warning("item {0} is not a widget, can't update it!".format(window_def[section]))
-            else:
-                logger.error("can't update configuration, item or section {0} not found in config file!".format(section))
+        for widget, config, key, spec, comments in self.leaves:
+            if config is not None:
+                config[key] = widget.getValue()
+                widget.dirty = False #The config file now contains the value of the widget
 
 
 
@@ -536,10 +548,44 @@ class ConfigWindow(QDialog):
 # The classes below are all based on QWidgets and allow to create various predefined elements for the configuration window #
 ############################################################################################################################
 
+def _layoutLabelAndItem(widget, text, item):
+    """
+    Layout a label and an input item (spinbox, combobox, ...) on a single line of a widget. The layout is directly created for the widget, instead of being created with the widget's parent and then reassigned.
+    @param widget: the widget that hosts the label and the item
+    @param text: text string of the label
+    @param item: the input item, it is aligned on the right
+    @return (label, layout): the QLabel and the QHBoxLayout that were created
+    """
+    label = QLabel(text)
+    layout = QHBoxLayout(widget)
+    
+    item.setMinimumWidth(200) #Provide better alignment with other items
+    layout.addWidget(label)
+    layout.addStretch()
+    layout.addWidget(item)
+    return (label, layout)
+
+
+def _setBlocked(item, setter, value):
+    """
+    Assign a value read from the config file without emitting the signals of the item: it's not a change made by the user
+    @param item: the Qt object whose signals are blocked
+    @param setter: the method used to assign the value (eg item.setValue)
+    @param value: the value given to the setter
+    """
+    blocked = item.blockSignals(True)
+    setter(value)
+    item.blockSignals(blocked)
+
+
 class CfgCheckBox(QCheckBox):
     """
     Subclassed QCheckBox to match our needs.
     """
+    
+    #Values used in the config file for each state of the checkbox (note: this isn't the order of the Qt states)
+    _STATE_MAP = {QtCore.Qt.Unchecked: 0, QtCore.Qt.Checked: 1, QtCore.Qt.PartiallyChecked: 2}
+    _INV_STATE_MAP = {0: QtCore.Qt.Unchecked, 1: QtCore.Qt.Checked, 2: QtCore.Qt.PartiallyChecked}
 
     def __init__(self, text, tristate = False, parent = None):
         """
@@ -549,6 +595,8 @@ class CfgCheckBox(QCheckBox):
         """
         QCheckBox.__init__(self, text, parent)
         self.setTristate(tristate)
+        self.dirty = False #True when the state was modified by the user, it must be reloaded if the changes are cancelled
+        self.stateChanged.connect(self.setDirty)
 
     def setSpec(self, spec):
         """
@@ -559,6 +607,12 @@ class CfgCheckBox(QCheckBox):
         if spec['comment']:
             self.setWhatsThis(spec['comment'])
 
+    def setDirty(self, *args):
+        """
+        Slot called when the user modifies the item, it must be reloaded if the changes are cancelled
+        """
+        self.dirty = True
+
     def validateValue(self):
         """
         This item can't be wrong, so we always return true and an empty string
@@ -570,27 +624,15 @@ class CfgCheckBox(QCheckBox):
         """
         @return 0 when the checkbox is unchecked, 1 if it is checked and 2 if it is partly checked (tristate must be set to true for tristate mode)
         """
-        check_state = self.checkState()
-        if check_state == QtCore.Qt.Unchecked:
-            check_state = 0
-        elif check_state == QtCore.Qt.Checked:
-            check_state = 1
-        elif check_state == QtCore.Qt.PartiallyChecked:
-            check_state = 2
-            
-        return check_state
+        return self._STATE_MAP[self.checkState()]
 
     def setValue(self, value):
         """
         Assign the value for our object
         @param value: 0 when the checkbox is unchecked, 1 if it is checked and 2 if it is partly checked (tristate must be set to true for tristate mode)
         """
-        if value == 0:
-            self.setCheckState(QtCore.Qt.Unchecked)
-        elif value == 2:
-            self.setCheckState(QtCore.Qt.PartiallyChecked)
-        else:
-            self.setCheckState(QtCore.Qt.Checked)
+        _setBlocked(self, self.setCheckState, self._INV_STATE_MAP.get(value, QtCore.Qt.Checked)) #Any other value (eg True) means checked
+        self.dirty = False
 
 
 class CfgSpinBox(QWidget):
@@ -612,15 +654,10 @@ class CfgSpinBox(QWidget):
             self.setUnit(unit)
 
         self.setSpec({'minimum': minimum, 'maximum': maximum, 'comment': ''})
+        self.dirty = False #True when the value was modified by the user, it must be reloaded if the changes are cancelled
+        self.spinbox.valueChanged.connect(self.setDirty)
 
-        self.label = QLabel(text, parent)
-        self.layout = QHBoxLayout(parent);
-        
-        self.spinbox.setMinimumWidth(200) #Provide better alignment with other items
-        self.layout.addWidget(self.label)
-        self.layout.addStretch()
-        self.layout.addWidget(self.spinbox)
-        self.setLayout(self.layout)
+        self.label, self.layout = _layoutLabelAndItem(self, text, self.spinbox)
 
     def setSpec(self, spec):
         """
@@ -645,6 +682,12 @@ class CfgSpinBox(QWidget):
         """
         self.spinbox.setSuffix(unit)
 
+    def setDirty(self, *args):
+        """
+        Slot called when the user modifies the item, it must be reloaded if the changes are cancelled
+        """
+        self.dirty = True
+
     def validateValue(self):
         """
         This item can't be wrong, so we always return true and an empty string
@@ -663,7 +706,12 @@ class CfgSpinBox(QWidget):
         Assign the value for our object
         @param value: int value
         """
-        self.spinbox.setValue(value)
+        _setBlocked(self.spinbox, self.spinbox.setValue, value)
+        self.dirty = False
+
+
+#Regexps used by the CorrectedDoubleSpinBox validators, indexed by the decimal separator
+_validator_regexps = {}
 
 
 class CorrectedDoubleSpinBox(QDoubleSpinBox):
@@ -678,23 +726,27 @@ class CorrectedDoubleSpinBox(QDoubleSpinBox):
     def __init__(self, parent = None):
         QDoubleSpinBox.__init__(self, parent)
         self.saved_suffix = ''
-        #Let's use the locale decimal separator if it is different from the dot ('.')
+        #Let's use the locale decimal separator if it is different from the dot ('.'). The regexp is built once for all the spinboxes
         local_decimal_separator = QLocale().decimalPoint()
-        if local_decimal_separator == '.':
-            local_decimal_separator = ''
-        self.lineEdit().setValidator(QRegExpValidator(QRegExp("-?[0-9]*[.{0}]?[0-9]*.*".format(local_decimal_separator)), self))
+        self.decimal_point = local_decimal_separator #Cached for valueFromText(), called for each char entered
+        regexp = _validator_regexps.get(local_decimal_separator)
+        if regexp is None:
+            regexp = QRegExp("-?[0-9]*[.{0}]?[0-9]*.*".format('' if local_decimal_separator == '.' else local_decimal_separator))
+            _validator_regexps[local_decimal_separator] = regexp
+        self.lineEdit().setValidator(QRegExpValidator(regexp, self))
 
     def setSuffix(self, suffix):
         self.saved_suffix = suffix
         QDoubleSpinBox.setSuffix(self, suffix)
 
     def valueFromText(self, text):
-        if c.PYQT5notPYQT4:
-            #print("valueFromText({0})".format(text.encode('utf-8')))
-            text = text.encode('utf-8').replace(self.saved_suffix.encode('utf-8'), '').replace(QLocale().decimalPoint(), '.')
-        else:
-            #print("valueFromText({0})".format(text))
-            text = text.replace(self.saved_suffix, '').replace(QLocale().decimalPoint(), '.')
+        #print("valueFromText({0})".format(text))
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        if self.saved_suffix:
+            text = text.replace(self.saved_suffix, '')
+        if self.decimal_point != '.':
+            text = text.replace(self.decimal_point, '.')
         try:
             #result = float(text.replace('.', QLocale().decimalPoint()))
             result = float(text) #python expect a dot ('.') as decimal separator
@@ -734,15 +786,10 @@ class CfgDoubleSpinBox(CfgSpinBox):
         
         if precision is not None:
             self.spinbox.setDecimals(precision)
+        self.dirty = False #True when the value was modified by the user, it must be reloaded if the changes are cancelled
+        self.spinbox.valueChanged.connect(self.setDirty)
 
-        self.label = QLabel(text, parent)
-        self.layout = QHBoxLayout(parent);
-        
-        self.spinbox.setMinimumWidth(200) #Provide better alignment with other items
-        self.layout.addWidget(self.label)
-        self.layout.addStretch()
-        self.layout.addWidget(self.spinbox)
-        self.setLayout(self.layout)
+        self.label, self.layout = _layoutLabelAndItem(self, text, self.spinbox)
 
 
 class CfgLineEdit(QWidget):
@@ -760,6 +807,8 @@ class CfgLineEdit(QWidget):
         QWidget.__init__(self, parent)
         
         self.lineedit = QLineEdit(parent)
+        self.dirty = False #True when the text was modified by the user, the values loaded from the config file don't need to be checked again
+        self.lineedit.textChanged.connect(self.setDirty)
         
         self.setSpec({'minimum': size_min, 'maximum': size_max, 'comment': ''})
         if size_min is not None:
@@ -789,6 +838,12 @@ class CfgLineEdit(QWidget):
         if spec['comment']:
             self.setWhatsThis(spec['comment'])
 
+    def setDirty(self, *args):
+        """
+        Slot called when the user modifies the item, its value needs to be validated again
+        """
+        self.dirty = True
+
     def validateValue(self):
         """
         Check the minimum length value
@@ -796,7 +851,11 @@ class CfgLineEdit(QWidget):
          - result_bool: True if no errors were encountered, False otherwise
          - result_string: a string containing all the errors encountered during the validation
         """
-        field_length = len(str(self.lineedit.text()))
+        if not self.dirty:
+            #Unchanged since it was loaded from the config file
+            return (True, '')
+        
+        field_length = len(_toStr(self.lineedit.text()))
         if field_length < self.size_min:
             result = (False, str(self.tr('\nNot enough chars (expected {0}, found {1}) for the field "{2}"\n')).format(self.size_min, field_length, self.label.text()))
         else:
@@ -808,14 +867,15 @@ class CfgLineEdit(QWidget):
         """
         @return: the current value of the QSpinBox
         """
-        return str(self.lineedit.text())
+        return _toStr(self.lineedit.text())
 
     def setValue(self, value):
         """
         Assign the value for our object
         @param value: text string
         """
-        self.lineedit.setText(value)
+        _setBlocked(self.lineedit, self.lineedit.setText, value)
+        self.dirty = False
 
 
 class CfgListEdit(CfgLineEdit):
@@ -839,12 +899,7 @@ class CfgListEdit(CfgLineEdit):
         """
         @return the current value of the QSpinBox (string list)
         """
-        item_list = str(self.lineedit.text()).split(self.separator)
-        i = 0
-        while i < len(item_list):
-            item_list[i] = item_list[i].strip(' ') #remove leading and trailing whitespaces
-            i += 1
-        return item_list
+        return [item.strip(' ') for item in _toStr(self.lineedit.text()).split(self.separator)] #remove leading and trailing whitespaces
 
     def setValue(self, value):
         """
@@ -855,7 +910,7 @@ class CfgListEdit(CfgLineEdit):
         if isinstance(value, (list, tuple)):
             joined_value = (self.separator + ' ').join(value) #Join the strings and add a space for more readability (the space will be removed when writting)
         
-        self.lineedit.setText(joined_value)
+        CfgLineEdit.setValue(self, joined_value)
 
 
 
@@ -874,20 +929,16 @@ class CfgComboBox(QWidget):
         QWidget.__init__(self, parent)
         
         self.combobox = QComboBox(parent)
+        self.items_indexes = {} #Index of each option in the combobox, indexed by its text
         
         if isinstance(items_list, (list, tuple)):
             self.setSpec({'string_list': items_list, 'comment': ''})
         if default_item is not None:
             self.setValue(default_item)
+        self.dirty = False #True when the selection was modified by the user, it must be reloaded if the changes are cancelled
+        self.combobox.currentIndexChanged.connect(self.setDirty)
         
-        self.label = QLabel(text, parent)
-        self.layout = QHBoxLayout(parent);
-        
-        self.combobox.setMinimumWidth(200) #Provide better alignment with other items
-        self.layout.addWidget(self.label)
-        self.layout.addStretch()
-        self.layout.addWidget(self.combobox)
-        self.setLayout(self.layout)
+        self.label, self.layout = _layoutLabelAndItem(self, text, self.combobox)
 
     def setSpec(self, spec):
         """
@@ -896,10 +947,19 @@ class CfgComboBox(QWidget):
         """
         self.combobox.clear()
         self.combobox.addItems(spec['string_list'])
+        self.items_indexes = {}
+        for i, item in enumerate(spec['string_list']):
+            self.items_indexes.setdefault(item, i) #Keep the first one in case of duplicates, like QComboBox.findText()
         
         if spec['comment']:
             self.setWhatsThis(spec['comment'])
 
+    def setDirty(self, *args):
+        """
+        Slot called when the user modifies the item, it must be reloaded if the changes are cancelled
+        """
+        self.dirty = True
+
     def validateValue(self):
         """
         This item can't be wrong, so we always return true and an empty string
@@ -918,7 +978,23 @@ class CfgComboBox(QWidget):
         Assign the value for our object
         @param value: the text of the entry to select in the combobox
         """
-        self.combobox.setCurrentIndex(self.combobox.findText(value)) #Compatible with both PyQt4 and PyQt5
+        _setBlocked(self.combobox, self.combobox.setCurrentIndex, self.items_indexes.get(value, -1)) #-1 unselects the combobox if the value isn't found
+        self.dirty = False
+
+
+_MISSING = object() #Marks the columns missing from the values given to CfgTable.setValue()
+
+
+def _mixedKey(key):
+    """
+    Sort key for the lines of a CfgTable: numeric keys (eg tool numbers) are sorted by value, before the other keys that are sorted alphabetically
+    @param key: the key of a line (string)
+    @return: a tuple that can be compared with the ones of the other keys
+    """
+    try:
+        return (0, float(key))
+    except ValueError:
+        return (1, key)
 
 
 class CfgTable(QWidget):
@@ -926,6 +1002,10 @@ class CfgTable(QWidget):
     Subclassed QTableWidget to match our needs.
     """
 
+    #Icons of the add/remove buttons, shared by all the tables. They are loaded by the first table, when the QApplication exists
+    _ADD_ICON = None
+    _REMOVE_ICON = None
+
     def __init__(self, text, columns = None, parent = None):
         """
         Initialization of the CfgTable class (editable 2D table).
@@ -936,6 +1016,8 @@ class CfgTable(QWidget):
         
         self.tablewidget = QTableWidget(parent)
         self.tablewidget.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.dirty = False #True when the table was modified by the user, the values loaded from the config file don't need to be checked again
+        self.tablewidget.itemChanged.connect(self.setDirty)
         if isinstance(columns, (list, tuple)):
             self.setSpec({'string_list': columns, 'comment': ''})
         else:
@@ -944,10 +1026,15 @@ class CfgTable(QWidget):
         self.tablewidget.horizontalHeader().sectionClicked.connect(self.tablewidget.clearSelection) #Allow to unselect the lines by clicking on the column name (useful to add a line at the end)
         
         self.label = QLabel(text, parent)
-        self.button_add = QPushButton(QIcon(QPixmap(":/images/list-add.png")), "")
-        self.button_remove = QPushButton(QIcon(QPixmap(":/images/list-remove.png")), "")
+        if CfgTable._ADD_ICON is None:
+            CfgTable._ADD_ICON = QIcon(QPixmap(":/images/list-add.png"))
+            CfgTable._REMOVE_ICON = QIcon(QPixmap(":/images/list-remove.png"))
+        self.button_add = QPushButton(CfgTable._ADD_ICON, "")
+        self.button_remove = QPushButton(CfgTable._REMOVE_ICON, "")
         self.button_add.clicked.connect(self.appendLine)
         self.button_remove.clicked.connect(self.removeLine)
+        self.button_add.clicked.connect(self.setDirty)
+        self.button_remove.clicked.connect(self.setDirty)
         self.layout_button = QVBoxLayout();
         self.layout_button.addWidget(self.button_add)
         self.layout_button.addWidget(self.button_remove)
@@ -974,7 +1061,7 @@ class CfgTable(QWidget):
         Set the specifications for the item (min/max values, ...)
         @param spec: the specifications dict (can contain the following keys: minimum, maximum, comment, string_list)
         """
-        self.keys = spec['string_list']
+        self.keys = list(spec['string_list']) #Copy, the list of the caller must not be modified below
         if len(self.keys) > 0 and not self.keys[0]:
             self.keys[0] = 'name' #name of first column is normaly undefined in configspec, so we use a generic name, just to display something in the header of the QTable
         self.tablewidget.setColumnCount(len(self.keys))
@@ -992,25 +1079,37 @@ class CfgTable(QWidget):
         if selected_row < 0 or len(self.tablewidget.selectedIndexes()) <= 0: #Trick to be able to insert lines before the first and after the last line (click on column name to unselect the lines)
             selected_row = self.tablewidget.rowCount()
             
-        self.tablewidget.insertRow(selected_row)
+        self.insertLine(selected_row, line)
+        QTimer.singleShot(0, self.finalizeLayout) #Resize the columns once the new line is processed by Qt
+
+    def insertLine(self, row, line = None):
+        """
+        Insert a line at the given row of the table. Only this row is resized, the columns are resized by finalizeLayout()
+        @param row: row number of the new line (int)
+        @param line: a string list containing all the values for this lines. If line is None, an empty line is inserted
+        """
+        self.tablewidget.insertRow(row)
         
         #If provided, fill the table with the content of the line list
         if line is not None and isinstance(line, (list, tuple)) and len(line) >= self.tablewidget.columnCount():
             for i in range(self.tablewidget.columnCount()):
-                #self.tablewidget.setItem(selected_row, i, QTableWidgetItem(line[i]))
-                self.setCellValue(selected_row, i, line[i])
+                #self.tablewidget.setItem(row, i, QTableWidgetItem(line[i]))
+                self.setCellValue(row, i, line[i])
         else:
             for i in range(self.tablewidget.columnCount()):
-                self.setCellValue(selected_row, i, "") #Don't remove this line, otherwise the subclasses won't be able to set custom widget into the table.
+                self.setCellValue(row, i, "") #Don't remove this line, otherwise the subclasses won't be able to set custom widget into the table.
+        
+        #Resize the row to the content
+        self.tablewidget.resizeRowToContents(row)
 
+    def finalizeLayout(self):
+        """
+        Resize the columns of the table to their content. This has to browse all the rows, so it's only done once lines are inserted
+        """
         #Resize the columns to the content, except for the last one
         for i in range(self.tablewidget.columnCount() - 1):
             self.tablewidget.resizeColumnToContents(i)
 
-        #Resize the rows to the content
-        for i in range(self.tablewidget.rowCount()):
-            self.tablewidget.resizeRowToContents(i)
-
     def removeLine(self):
         """
         Remove a line from the table. The selected line is suppressed, or the last line if no line is selected
@@ -1031,6 +1130,12 @@ class CfgTable(QWidget):
         """
         self.tablewidget.setItem(line, column, QTableWidgetItem(value))
 
+    def setDirty(self, *args):
+        """
+        Slot called when the user modifies the table, its content needs to be validated again
+        """
+        self.dirty = True
+
     def validateValue(self):
         """
         Default implementation always return true (OK) and an empty string
@@ -1045,26 +1150,26 @@ class CfgTable(QWidget):
         {'pause': {'gcode': 'M5 (Spindle off)\nM9 (Coolant off)\nM0\n\nM8\nS5000M03 (Spindle 5000rpm cw)\n'}, 'probe_tool': {'gcode': '\nO<Probe_Tool> CALL\nS6000 M3 M8\n'}}
         """
         result_dict = {}
+        nb_columns = self.tablewidget.columnCount() #Doesn't change while we read the table
+        keys = self.keys
+        table_item = self.tablewidget.item #Bound once, it is called for each cell
         for i in range(self.tablewidget.rowCount()):
-            key = self.tablewidget.item(i, 0)
+            key = table_item(i, 0)
             if not key:
                 continue
-            key = str(key.text())
+            key = _toStr(key.text())
             if not key:
                 continue
             result_dict[key] = {}
             
-            j = 1
-            while j < self.tablewidget.columnCount():
-                sub_key = self.keys[j] #Column name
-                value = self.tablewidget.item(i, j)
+            for j in range(1, nb_columns):
+                sub_key = keys[j] #Column name
+                value = table_item(i, j)
                 if not value:
-                    j += 1
                     continue
-                value = str(value.text())
+                value = _toStr(value.text())
                 if sub_key is not None:
                     result_dict[key][sub_key] = value
-                j += 1
         
         return result_dict
     
@@ -1074,35 +1179,53 @@ class CfgTable(QWidget):
         @param value: this is a nested dict, with keys going to the first column of our table and values going to the other columns. Example of received value:
         {'15': {'diameter': 1.5, 'speed': 6000.0, 'start_radius': 1.5}, '20': {'diameter': 2.0, 'speed': 6000.0, 'start_radius': 2.0}, '30': {'diameter': 3.0, 'speed': 6000.0, 'start_radius': 3.0}}
         """
+        if isinstance(value, dict) and not value and len(self.keys) > 0:
+            #Empty config: nothing to sort nor to resize, just empty the table
+            self.tablewidget.setRowCount(0)
+            self.dirty = False
+            return True
+        
         result = True
         if isinstance(value, dict) and len(self.keys) > 0:
-            self.tablewidget.setRowCount(0)
-            line = [None] * len(self.keys)
-            
-            #sort according to the key
-            item_list=[]
+            #Fill the whole table before repainting it, and don't emit signals for each cell
+            self.tablewidget.setUpdatesEnabled(False)
+            blocked = self.tablewidget.blockSignals(True)
             try:
-                #try numeric sort
-                item_list = sorted(value.keys(), key=float)
-            except ValueError:
-                #fallback to standard sort
-                item_list = sorted(value.keys())
-            
-            for item in item_list:
-                line[0] = item #First column is alway the key of the dict (eg it can be the tool number)
+                #sort according to the key (numeric keys first)
+                item_list = sorted(value.keys(), key=_mixedKey)
+                
+                #Create all the rows at once instead of inserting them one by one
+                self.tablewidget.setRowCount(0)
+                self.tablewidget.setRowCount(len(item_list))
                 
-                #Compute the other columns (the received value must contain a dict entry for each column)
-                i = 1
-                while i < len(self.keys):
-                    if self.keys[i] in value[item]:
-                        line[i] = value[item][self.keys[i]] #Get the value for a given column
-                    else:
-                        result = False
+                other_keys = self.keys[1:]
+                for row, item in enumerate(item_list):
+                    row_dict = value[item]
+                    line = [item] #First column is alway the key of the dict (eg it can be the tool number)
+                    
+                    #Compute the other columns (the received value must contain a dict entry for each column)
+                    for key in other_keys:
+                        cell_value = row_dict.get(key, _MISSING) #Get the value for a given column
+                        if cell_value is _MISSING:
+                            result = False
+                            break
+                        line.append(cell_value)
+                    
+                    if result is False:
+                        self.tablewidget.setRowCount(row) #Drop the rows that can't be filled
                         break
-                    i += 1
+                    
+                    for i, cell_value in enumerate(line):
+                        self.setCellValue(row, i, cell_value)
                 
-                if result is True:
-                    self.appendLine(line)
+                #Resize the rows and the columns only once, when the whole table is filled
+                self.tablewidget.resizeRowsToContents()
+                self.finalizeLayout()
+            finally:
+                #Always restore the table, even if something went wrong
+                self.tablewidget.blockSignals(blocked)
+                self.tablewidget.setUpdatesEnabled(True)
+            self.dirty = not result #An incomplete table must be checked
         else:
             result = False
         
@@ -1135,6 +1258,7 @@ class CfgTableCustomActions(CfgTable):
             text_edit.setAcceptRichText(False)
             text_edit.setAutoFormatting(QTextEdit.AutoNone)
             text_edit.setPlainText(value)
+            text_edit.textChanged.connect(self.setDirty) #The QTextEdit changes are not reported by the itemChanged signal of the table
             self.tablewidget.setCellWidget(line, column, text_edit)
         else:
             #Normal case: use standard QT functions
@@ -1147,27 +1271,36 @@ class CfgTableCustomActions(CfgTable):
          - result_bool: True if no errors were encountered, False otherwise
          - result_string: a string containing all the errors encountered during the validation
         """
+        if not self.dirty:
+            #Unchanged since it was loaded from the config file
+            return (True, '')
+        
         #For now everything is OK
-        result_string = ''
+        errors = [] #Error messages, joined once at the end
         result_bool = True
-        keys_list = []
+        keys_seen = set()
+        table_item = self.tablewidget.item #Bound once, it is called for each row
+        nb_duplicate_elements = 0
         
         if self.tablewidget.rowCount() > 0 and self.tablewidget.columnCount() > 0:
             for i in range(self.tablewidget.rowCount()):
-                if not self.tablewidget.item(i, 0) or not self.tablewidget.item(i, 0).text():
+                key = table_item(i, 0)
+                key = key.text() if key else ''
+                if not key:
                     result_bool = False
-                    result_string += str(self.tr('\nThe cell at line {0}, column 0 must not be empty for the table "{1}"\n')).format(i, self.label.text())
+                    errors.append(str(self.tr('\nThe cell at line {0}, column 0 must not be empty for the table "{1}"\n')).format(i, self.label.text()))
+                elif key in keys_seen:
+                    #Count the duplicates while browsing the "keys" of the first column (here a key is the custom action name)
+                    nb_duplicate_elements += 1
                 else:
-                    #Create a list with all the "keys" from the first column (here a key is the custom action name)
-                    keys_list.append(self.tablewidget.item(i, 0).text())
+                    keys_seen.add(key)
             
-            nb_duplicate_elements = len(keys_list) - len(set(keys_list))
             if nb_duplicate_elements != 0:
                 #There are duplicate entries, that's wrong because the key must be unique
                 result_bool = False
-                result_string += str(self.tr('\nFound {0} duplicate elements for the table "{1}"\n')).format(nb_duplicate_elements, self.label.text())
+                errors.append(str(self.tr('\nFound {0} duplicate elements for the table "{1}"\n')).format(nb_duplicate_elements, self.label.text()))
             
-        return (result_bool, result_string)
+        return (result_bool, ''.join(errors))
 
     def getValue(self):
         """
@@ -1176,32 +1309,45 @@ class CfgTableCustomActions(CfgTable):
         {'pause': {'gcode': 'M5 (Spindle off)\nM9 (Coolant off)\nM0\n\nM8\nS5000M03 (Spindle 5000rpm cw)\n'}, 'probe_tool': {'gcode': '\nO<Probe_Tool> CALL\nS6000 M3 M8\n'}}
         """
         result_dict = {}
+        nb_columns = self.tablewidget.columnCount() #Doesn't change while we read the table
+        keys = self.keys
+        table_item = self.tablewidget.item #Bound once, they are called for each cell
+        cell_widget = self.tablewidget.cellWidget
         #Get the keys (first column)
         for i in range(self.tablewidget.rowCount()):
-            key = self.tablewidget.item(i, 0)
+            key = table_item(i, 0)
             if not key:
                 continue
-            key = str(key.text())
+            key = _toStr(key.text())
             if not key:
                 continue
             result_dict[key] = {}
             
             #Get the values (other columns)
-            j = 1
-            while j < self.tablewidget.columnCount():
-                sub_key = self.keys[j] #Column name
-                value = self.tablewidget.cellWidget(i, j)
+            for j in range(1, nb_columns):
+                sub_key = keys[j] #Column name
+                value = cell_widget(i, j)
                 if not value:
-                    j += 1
                     continue
-                value = str(value.toPlainText())
+                value = _toStr(value.toPlainText())
                 if sub_key is not None:
                     result_dict[key][sub_key] = value
-                j += 1
         
         return result_dict
 
 
+def _createToolSpinBox(spinbox_class):
+    """
+    Create a spinbox for a cell of the tools table, with the limits shared by all the cells
+    @param spinbox_class: QSpinBox for the tool number, CorrectedDoubleSpinBox for the other columns
+    @return: the new spinbox
+    """
+    spinbox = spinbox_class()
+    spinbox.setMinimum(0)
+    spinbox.setMaximum(1000000000) #Default value is 99
+    return spinbox
+
+
 class CfgTableToolParameters(CfgTable):
     """
     Subclassed CfgTableWidget to use muli-line edits for storing the custom GCODE.
@@ -1225,18 +1371,15 @@ class CfgTableToolParameters(CfgTable):
         """
         if column > 0:
             #we use QDoubleSpinBox for storing the values
-            spinbox = CorrectedDoubleSpinBox()
-            spinbox.setMinimum(0)
-            spinbox.setMaximum(1000000000) #Default value is 99
+            spinbox = _createToolSpinBox(CorrectedDoubleSpinBox)
             computed_value = 0.0
             try: computed_value = float(value) #Convert the value to float
             except ValueError: pass
             spinbox.setValue(computed_value)
+            spinbox.valueChanged.connect(self.setDirty) #The changes are needed to reload the table if they are cancelled
         else:
             #tool number is an integer
-            spinbox = QSpinBox()
-            spinbox.setMinimum(0)
-            spinbox.setMaximum(1000000000) #Default value is 99
+            spinbox = _createToolSpinBox(QSpinBox)
             
             computed_value = 0
             try:
@@ -1245,6 +1388,7 @@ class CfgTableToolParameters(CfgTable):
                 computed_value = self.max_tool_number + 1
             self.max_tool_number = max(self.max_tool_number, computed_value) #Store the max value for the tool number, so that we can automatically increment this value for new tools
             spinbox.setValue(computed_value) #first column is the key, it must be an int
+            spinbox.valueChanged.connect(self.setDirty) #The keys are checked by validateValue()
         
         self.tablewidget.setCellWidget(line, column, spinbox)
 
@@ -1255,34 +1399,41 @@ class CfgTableToolParameters(CfgTable):
          - result_bool: True if no errors were encountered, False otherwise
          - result_string: a string containing all the errors encountered during the validation
         """
+        if not self.dirty:
+            #Unchanged since it was loaded from the config file
+            return (True, '')
+        
         #For now everything is OK
         contains_tool_1 = False
-        result_string = ''
+        errors = [] #Error messages, joined once at the end
         result_bool = True
         keys_list = []
+        cell_widget = self.tablewidget.cellWidget #Bound once, it is called for each row
         
         if self.tablewidget.rowCount() > 0 and self.tablewidget.columnCount() > 0:
             for i in range(self.tablewidget.rowCount()):
-                if not self.tablewidget.cellWidget(i, 0):
+                key = cell_widget(i, 0)
+                if not key:
                     result_bool = False
-                    result_string += str(self.tr('\nThe cell at line {0}, column 0 must not be empty for the table "{1}"\n')).format(i, self.label.text())
+                    errors.append(str(self.tr('\nThe cell at line {0}, column 0 must not be empty for the table "{1}"\n')).format(i, self.label.text()))
                 else:
                     #Create a list with all the "keys" from the first column (here a key is the custom action name)
-                    keys_list.append(str(self.tablewidget.cellWidget(i, 0).value()))
-                    if self.tablewidget.cellWidget(i, 0).value() == 1:
+                    key = key.value()
+                    keys_list.append(str(key))
+                    if key == 1:
                         contains_tool_1 = True
             
             nb_duplicate_elements = len(keys_list) - len(set(keys_list))
             if nb_duplicate_elements != 0:
                 #There are duplicate entries, that's wrong because the key must be unique
                 result_bool = False
-                result_string += str(self.tr('\nFound {0} duplicate elements for the table "{1}"\n')).format(nb_duplicate_elements, self.label.text())
+                errors.append(str(self.tr('\nFound {0} duplicate elements for the table "{1}"\n')).format(nb_duplicate_elements, self.label.text()))
         
         if not contains_tool_1:
             result_bool = False
-            result_string += str(self.tr('\nThe table "{0}" must always contains tool number \'1\'\n')).format(self.label.text()) #Note: str() is needed for PyQt4
+            errors.append(str(self.tr('\nThe table "{0}" must always contains tool number \'1\'\n')).format(self.label.text())) #Note: str() is needed for PyQt4
 
-        return (result_bool, result_string)
+        return (result_bool, ''.join(errors))
 
     def getValue(self):
         """
@@ -1290,10 +1441,16 @@ class CfgTableToolParameters(CfgTable):
         Example of returned value:
         {'pause': {'gcode': 'M5 (Spindle off)\nM9 (Coolant off)\nM0\n\nM8\nS5000M03 (Spindle 5000rpm cw)\n'}, 'probe_tool': {'gcode': '\nO<Probe_Tool> CALL\nS6000 M3 M8\n'}}
         """
+        if self.tablewidget.rowCount() == 0:
+            return {} #Empty tools table
+        
         result_dict = {}
+        nb_columns = self.tablewidget.columnCount() #Doesn't change while we read the table
+        keys = self.keys
+        cell_widget = self.tablewidget.cellWidget #Bound once, it is called for each cell
         #Get the keys (first column)
         for i in range(self.tablewidget.rowCount()):
-            key = self.tablewidget.cellWidget(i, 0)
+            key = cell_widget(i, 0)
             if not key:
                 continue
             key = str(key.value())
@@ -1302,16 +1459,13 @@ class CfgTableToolParameters(CfgTable):
             result_dict[key] = {}
             
             #Get the values (other columns)
-            j = 1
-            while j < self.tablewidget.columnCount():
-                sub_key = self.keys[j] #Column name
-                value = self.tablewidget.cellWidget(i, j)
+            for j in range(1, nb_columns):
+                sub_key = keys[j] #Column name
+                value = cell_widget(i, j)
                 if not value:
-                    j += 1
                     continue
                 value = value.value()
                 if sub_key is not None:
                     result_dict[key][sub_key] = value
-                j += 1
         
         return result_dict